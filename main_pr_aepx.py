@@ -1,19 +1,25 @@
 import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
-from pathlib import Path, PureWindowsPath, PurePosixPath
+from pathlib import Path
 import gzip
 import os
-import xml.etree.ElementTree as ET
+import re
+import zlib
+import lxml.etree as LET
 from datetime import datetime
 import requests
 import json
+import pickle
+import queue
+import threading
 import traceback
 import unicodedata
 # ----------------------------
 # 設定 / 常數
 # ----------------------------
 CONFIG_PATH = Path.home() / ".pr_compare_tool_config.json"  # 用來記住使用者偏好
+CACHE_PATH = Path.home() / ".pr_compare_tool_cache.pkl"     # 專案解析結果快取
 LAMBDA_URL = "https://btgm2bmux2k4dtmgvq3bv4pdmy0muepe.lambda-url.ap-southeast-2.on.aws/"
 
 # ----------------------------
@@ -53,9 +59,50 @@ def save_config():
     except Exception as e:
         print("⚠️ 儲存設定失敗：", e)
 
+# ----------------------------
+# 專案解析快取（同一專案檔未變動時，重跑不必再解壓 / 解析 XML）
+# ----------------------------
+
+# 快取格式 / 解析規則版本：修改 _CANDIDATE_TAGS、IGNORE_*、_clean_to_filename 等會影響結果的規則時請 +1
+_PARSE_CACHE_VERSION = 1
+
+def load_parse_cache() -> dict:
+    """
+    讀取解析快取 {(路徑, mtime_ns, size): 檔名集合}
+    - 檔案不存在、損毀、格式不符或版本不同時回傳空 dict（舊快取直接作廢）
+    """
+    if CACHE_PATH.exists():
+        try:
+            with CACHE_PATH.open('rb') as f:
+                data = pickle.load(f)
+            if (isinstance(data, dict) and data.get("version") == _PARSE_CACHE_VERSION
+                    and isinstance(data.get("entries"), dict)):
+                return data["entries"]
+        except Exception:
+            pass
+    return {}
+
+
+def save_parse_cache():
+    """將解析快取寫回磁碟"""
+    with _PARSE_CACHE_LOCK:
+        snapshot = dict(_PARSE_CACHE)
+    try:
+        with CACHE_PATH.open('wb') as f:
+            pickle.dump({"version": _PARSE_CACHE_VERSION, "entries": snapshot}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        print("⚠️ 儲存解析快取失敗：", e)
+
+_PARSE_CACHE: dict = load_parse_cache()
+_PARSE_CACHE_LOCK = threading.Lock()   # 解析在背景執行緒寫入、關閉視窗時在主執行緒讀取
+
 # ----------------------------
 # LINE 相關
 # ----------------------------
+# 共用同一個 Session：同一次執行的後續呼叫可沿用 keep-alive 連線，省下 TLS 握手
+_SESSION = requests.Session()
+_SESSION.headers.update({'Content-Type': 'application/json'})
 
 def send_to_lambda(text: str, uid: str):
     """將訊息傳送給 AWS Lambda，由 Lambda 依照方案 A 發送 LINE push"""
@@ -64,10 +111,15 @@ def send_to_lambda(text: str, uid: str):
         "to_user_id": uid  # 方案 A：把 target uid 帶進 Lambda
     }
     try:
-        response = requests.post(LAMBDA_URL, headers={'Content-Type': 'application/json'}, json=payload, timeout=15)
+        response = _SESSION.post(LAMBDA_URL, json=payload, timeout=15)
         print("✅ Lambda 回應：", response.text)
     except Exception as e:
         print("❌ Lambda 呼叫失敗：", e)
+
+
+def send_to_lambda_async(text: str, uid: str):
+    """在背景 daemon 執行緒呼叫 send_to_lambda，GUI 不必等待網路往返"""
+    threading.Thread(target=send_to_lambda, args=(text, uid), daemon=True).start()
 # ----------------------------
 # --- 路徑 / 檔名正規化 
 # ----------------------------
@@ -98,80 +150,191 @@ def write_error_log(project_label: str, exc: Exception) -> Path:
     """把完整 Traceback 寫入 log，回傳檔案路徑"""
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_path = LOG_DIR / f"{project_label}_{ts}.log"
-    log_path.write_text(traceback.format_exc(), encoding="utf-8")
+    # 直接串流寫入檔案，不先在記憶體組出整段字串；用傳入的 exc，不依賴呼叫端仍在 except 區塊內
+    with log_path.open('w', encoding="utf-8") as f:
+        traceback.print_exception(type(exc), exc, exc.__traceback__, file=f)
     return log_path
 
 # ----------------------------
 # .prproj 解析 + 比對工具
 # ----------------------------
 
+# 取最後一個 / 或 \ 之後的片段：Windows 與 POSIX 路徑一次處理，不必建 PurePath
+_SEP_RE = re.compile(r'[^/\\]+$')
+
 def _clean_to_filename(raw: str) -> str:
     s = raw.strip().strip('"').strip("'")
     if s.startswith('\\\\?\\'):
         s = s[4:]
-    name = PureWindowsPath(s).name
-    if not name or name == s:
-        name = PurePosixPath(s).name
-    return name
+    m = _SEP_RE.search(s.rstrip('/\\'))
+    return m.group(0) if m else ""
+
+# 記錄素材路徑的標籤；"{*}" 代表任意 namespace，交給 lxml 在 C 層過濾
+_CANDIDATE_TAGS = ("{*}Path", "{*}FilePath", "{*}ActualMediaFilePath", "{*}AbsolutePath")
+
+_READ_CHUNK = 1 << 16   # 每次從磁碟讀 64 KiB
+
+def _read_chunks(path: Path):
+    """逐塊讀取原始 bytes"""
+    with path.open('rb') as f:
+        while chunk := f.read(_READ_CHUNK):
+            yield chunk
+
+def _gunzip_chunks(path: Path):
+    """
+    以 zlib.decompressobj(wbits=31) 串流解壓 gzip，逐塊產出解壓後的 bytes
+    - 不經 gzip.GzipFile 的 Python 層緩衝，解壓全程在 C 層
+    - 開頭不是 gzip magic 時丟 gzip.BadGzipFile、檔案被截斷時丟 EOFError（與 gzip.open 相同）
+    """
+    d = zlib.decompressobj(wbits=31)
+    member_started = False   # 目前這一段 gzip 是否已餵入資料
+    for i, chunk in enumerate(_read_chunks(path)):
+        if i == 0 and not chunk.startswith(b'\x1f\x8b'):
+            raise gzip.BadGzipFile("Not a gzipped file")
+        while chunk:
+            if not member_started:
+                # 段與段之間 / 檔尾可能有 NUL 補齊，gzip.open 會略過，這裡比照處理
+                chunk = chunk.lstrip(b'\0')
+                if not chunk:
+                    break
+                member_started = True
+            yield d.decompress(chunk)
+            if not d.eof:
+                break
+            # 多段（multi-member）gzip：下一段換新的 decompressobj 接著解
+            chunk = d.unused_data
+            d = zlib.decompressobj(wbits=31)
+            member_started = False
+    if member_started and not d.eof:
+        raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+    yield d.flush()
+
+def _iter_candidates(chunks):
+    """把 bytes 區塊餵給 lxml XMLPullParser，逐一產出已結束的候選節點"""
+    parser = LET.XMLPullParser(events=("end",), tag=_CANDIDATE_TAGS,
+                               recover=True, huge_tree=True)
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.read_events()
+    root_xml = parser.close()
+    yield from parser.read_events()
+    # recover=True 遇到非 XML 內容不會報錯、只會產不出根節點 → 視為解析失敗，不可當成「沒有素材」
+    if root_xml is None:
+        raise ValueError("專案檔內容不是有效的 XML（找不到根節點）")
+
+def _collect_filenames(chunks) -> set[str]:
+    """串流解析 XML bytes 區塊，回傳線上素材的正規化檔名集合"""
+    # 解析 XML：只有候選標籤會回到 Python，其餘節點在 C 層略過
+    filenames: set[str] = set()
+    seen_raw: set[str] = set()   # 同一素材常被多個片段重複引用，相同原始字串只處理一次
+    for _, elem in _iter_candidates(chunks):
+        txt = elem.text
+        # 只有線上引用才記入 seen_raw：離線那筆先出現時，不會把同路徑的線上引用一併略過
+        if txt and txt not in seen_raw and not _has_offline_attr(elem):   # ← ❶ 若 Offline="true" 則跳過
+            seen_raw.add(txt)
+            name = _clean_to_filename(txt)
+            if '.' in name and not is_ignored(name):
+                filenames.add(_norm_name(name))  # ← ❷ 排除可忽略檔、正規化後加入集合
+        # 非候選節點不會回到 Python → 命中時沿祖先往上，把每層已處理完的前面兄弟清掉
+        # （祖先本身尚未結束，Offline 判斷仍可用）
+        # 走到根節點就停：根節點前面可能是文件層級的註解 / PI，它們沒有 parent、也無法刪除
+        elem.clear()
+        node = elem
+        while (parent := node.getparent()) is not None:
+            while node.getprevious() is not None:
+                del parent[0]
+            node = parent
+    return filenames
 
 def parse_project_filenames(project_path: str | os.PathLike) -> set[str]:
     """
     解析 .prproj / .aepx，回傳「線上素材檔名」集合（已做大小寫與 Unicode 正規化）
     - 若某素材在 XML 裡被標記 Offline=\"true\"，代表 Premiere 已認定找不到 → 不列入比對
+    - 以 (路徑, mtime, 檔案大小) 為 key 快取結果；專案檔未變動時直接回傳上次的集合
     """
     project_path = Path(project_path)
+    st = project_path.stat()
+    key = (str(project_path), st.st_mtime_ns, st.st_size)
+    with _PARSE_CACHE_LOCK:
+        cached = _PARSE_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    filenames = _read_project_filenames(project_path)
+    with _PARSE_CACHE_LOCK:
+        # 同一路徑只留最新版本，避免專案每存一次快取就多一筆
+        for old_key in [k for k in _PARSE_CACHE if k[0] == key[0]]:
+            del _PARSE_CACHE[old_key]
+        _PARSE_CACHE[key] = filenames
+    return filenames
+
+def _read_project_filenames(project_path: Path) -> set[str]:
+    """實際解壓 / 解析專案檔（不經快取）"""
     suffix = project_path.suffix.lower()
 
-    # .prproj 為 gzip 壓縮 XML
+    # .prproj 為 gzip 壓縮 XML：邊讀邊解壓邊餵給 lxml，不先讀成完整字串
     if suffix == ".prproj" or project_path.suffixes[-2:] == ['.prproj', '.gz']:
-        with project_path.open('rb') as f:
-            magic = f.read(2)
-            f.seek(0)
-            content = (
-                gzip.open(f, 'rt', encoding='utf-8').read()
-                if magic == b'\x1f\x8b' else
-                f.read().decode('utf-8-sig', errors='ignore')
-            )
+        try:
+            return _collect_filenames(_gunzip_chunks(project_path))
+        except gzip.BadGzipFile:
+            # 少數未壓縮的 .prproj → 改當純 XML 讀（lxml 可自行處理 BOM）
+            pass
 
     # .aepx 為純 XML（After Effects）
-    elif suffix == ".aepx":
-        root_xml = ET.parse(project_path).getroot()
-
-    else:
+    elif suffix != ".aepx":
         raise ValueError(f"不支援的專案格式：{suffix}")
-    
-    # 解析 XML：優先使用 lxml recover，失敗才退回內建 ET
-    try:
-        import lxml.etree as LET
-        parser = LET.XMLParser(recover=True)
-        root_xml = LET.fromstring(content.encode("utf-8"), parser=parser)
-        iter_elems = root_xml.iter()
-    except Exception:
-        # 若 lxml 不存在或仍失敗，改用內建 ET（可能丟 ParseError）
-        root_xml = ET.fromstring(content)
-        iter_elems = root_xml.iter()
-    
-    candidate_tags = {"Path", "FilePath", "ActualMediaFilePath", "AbsolutePath"}
-    filenames: set[str] = set()
-    for elem in iter_elems:
-        if elem.text and any(t.lower() in elem.tag.lower() for t in candidate_tags):
-            if _has_offline_attr(elem):          # ← ❶ 若 Offline="true" 則跳過
-                continue
-            name = _clean_to_filename(elem.text)
-            if '.' in name:
-                filenames.add(_norm_name(name))  # ← ❷ 正規化後加入集合
-    return filenames
+
+    return _collect_filenames(_read_chunks(project_path))
 
 # ---------------------------------------------------
 # 掃資料夾時就把檔名正規化
 # ---------------------------------------------------
+def _iter_folder_filenames(folder_path):
+    """
+    逐一產出資料夾（含子資料夾）內的檔名，已 casefold，且可忽略的檔案（proxy / 預覽檔）會略過
+    - 用 os.scandir 迭代走訪：檔案類型直接取自目錄項，不必對每個檔案再 stat 一次
+    - 與 rglob 相同：不進入 symlink 資料夾，但 symlink 檔案照樣計入
+    """
+    stack = [os.fspath(folder_path)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue                             # 無權限 / 已被移除的資料夾直接略過
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file() and not is_ignored(entry.name):
+                        yield _norm_name(entry.name)
+                except OSError:
+                    pass
+
 def scan_folder_filenames(folder_path):
-    folder_path = Path(folder_path)
-    # 回傳 set；元素皆已 casefold
-    return {_norm_name(f.name) for f in folder_path.rglob('*') if f.is_file()}
+    # 回傳 set；元素皆已 casefold，且可忽略的檔案（proxy / 預覽檔）不會進入集合
+    return set(_iter_folder_filenames(folder_path))
+
+def find_folder_filenames(folder_path, wanted: set[str]) -> set[str]:
+    """
+    只找 wanted 裡的檔名，回傳資料夾中實際存在的那些
+    - 全部找到就提早結束走訪，不必掃完整個資料夾
+    """
+    found: set[str] = set()
+    if not wanted:
+        return found
+    for name in _iter_folder_filenames(folder_path):
+        if name in wanted:
+            found.add(name)
+            if len(found) == len(wanted):
+                break
+    return found
 
 IGNORE_EXTENSIONS = {".pek", ".epr", ".cfa"}          # 代理檔、預覽檔
 IGNORE_SUBSTRINGS = {"_proxy", "_subclip"}            # 低畫質 Proxy / Subclip
+# 轉成 tuple：str.endswith 可直接吃 tuple，一次在 C 層比完所有副檔名
+_IGN_EXT = tuple(IGNORE_EXTENSIONS)
+_IGN_SUB = tuple(IGNORE_SUBSTRINGS)
 # 忽略字串（不區分大小寫）
 def is_ignored(filename: str) -> bool:
     """
@@ -179,31 +342,34 @@ def is_ignored(filename: str) -> bool:
     - 以副檔名為主；補充部分常見字串（不區分大小寫）
     """
     lower = filename.lower()
-    if any(lower.endswith(ext) for ext in IGNORE_EXTENSIONS):
-        return True
-    if any(sub in lower for sub in IGNORE_SUBSTRINGS):
-        return True
-    return False
+    return lower.endswith(_IGN_EXT) or any(sub in lower for sub in _IGN_SUB)
 # 比對專案檔案與資料夾中的檔案名稱
 # 添加檔案白名單.pek/.epr/proxy 
 # ---------------------------------------------------
-# 3. 比對：用「正規化後 key」做集合運算，再映回原名
+# 3. 比對：兩邊集合都已正規化、已排除可忽略檔，直接做集合運算
 # ---------------------------------------------------
-def compare_filenames(project_file, folder_path):
-    # ① 取原始集合並建立 key→原名 對照表
-    project_raw = parse_project_filenames(project_file)
-    disk_raw    = scan_folder_filenames(folder_path)  # 已正規化
+def compare_filenames(project_file, folder_path, want_extra: bool = True):
+    """
+    回傳 (matched, missing, extra) 三個已排序的檔名 list
+    - want_extra=False 時只找專案引用到的素材（找齊即停止掃描），extra 回傳空 list
+    """
+    project_files = parse_project_filenames(project_file)
+    if not want_extra:
+        found = find_folder_filenames(folder_path, project_files)
+        return sorted(found), sorted(project_files - found), []
 
-    project_map = {_norm_name(f): f for f in project_raw if not is_ignored(f)}
-    disk_map    = {_norm_name(f): f for f in disk_raw   if not is_ignored(f)}
+    actual_files  = scan_folder_filenames(folder_path)
 
-    # ② 用 key 交集 / 差集
-    project_keys = set(project_map)
-    disk_keys    = set(disk_map)
+    # 專案引用數通常遠小於資料夾檔案數：明確用小集合去查大集合
+    if len(project_files) <= len(actual_files):
+        small, large = project_files, actual_files
+    else:
+        small, large = actual_files, project_files
 
-    matched = sorted(project_map[k] for k in project_keys & disk_keys)
-    missing = sorted(project_map[k] for k in project_keys - disk_keys)
-    extra   = sorted(disk_map[k]    for k in disk_keys    - project_keys)
+    matched = sorted(small.intersection(large))
+    missing = sorted(project_files - actual_files)
+    # 專案沒有任何引用時，整個資料夾都算多餘，不必再做差集
+    extra   = sorted(actual_files - project_files if project_files else actual_files)
     return matched, missing, extra
 
 
@@ -298,14 +464,15 @@ def extract_project_label(prproj_path: str | Path) -> str:
     若不符合預期結構，則退而求其次回傳 .prproj 檔名（去掉副檔名）
     """
     p = Path(prproj_path)
+    parent = p.parent
 
     # (1) 正常情況：file → '07_終極專案打包檔' → <專案名稱>
-    if len(p.parents) >= 2 and "終極專案打包檔" in p.parent.name:
-        return p.parent.parent.name
+    if "終極專案打包檔" in parent.name and parent != parent.parent:
+        return parent.parent.name
 
     # (2) 萬一路徑少一層或命名不同，就回傳上一層
-    if len(p.parents) >= 1:
-        return p.parent.name
+    if parent != p:
+        return parent.name
 
     # (3) 再不行就用檔名（不含副檔名）當 fallback
     return p.stem
@@ -326,73 +493,103 @@ def run_compare():
     project_label = extract_project_label(prproj_path)
     report_date = datetime.now().strftime("%Y-%m-%d")
 
-    try:
-        matched, missing, extra = compare_filenames(prproj_path, folder_path)
-        output_text.delete(1.0, tk.END)
-        #輸出專案名稱
-        output_text.insert(tk.END, f"[{project_label}]\n✅ 對應成功的素材：{len(matched)}\n")
-        for f in matched:
-            output_text.insert(tk.END, f"  ✅ {f}\n")
-        output_text.insert(tk.END, f"❌ 專案中使用但資料夾找不到：{len(missing)}\n")
-        for f in missing:
-            output_text.insert(tk.END, f"  ❌ {f}\n")
-        output_text.insert(tk.END, f"⚠️ 資料夾中多餘素材（未在專案引用）：{len(extra)}\n")
-        for f in extra:
-            output_text.insert(tk.END, f"  ⚠️ {f}\n")
-
-        # 報告內容組合
-        report_date = datetime.now().strftime("%Y-%m-%d")
-        text_report = f"""# Premiere 專案素材比對報告
-
-## 專案檔案
-- {prproj_path}
-
-## 素材資料夾
-- {folder_path}
-
----
-
-## 對應成功的素材（共 {len(matched)} 筆）
-""" + '\n'.join(f"- {f}" for f in matched) + f"""
-
----
-
-## 專案中使用但資料夾找不到（共 {len(missing)} 筆）
-""" + '\n'.join(f"- {f}" for f in missing) + f"""
-
----
-
-## 資料夾中多餘素材（未在專案引用）（共 {len(extra)} 筆）
-""" + '\n'.join(f"- {f}" for f in extra)
+    # 背景執行緒與主執行緒之間的結果通道：("ok", 結果) 或 ("error", (例外, log 路徑))
+    result_q: queue.Queue = queue.Queue()
 
-        # 寫入純文字檔案
-        txt_file = Path(output_path) / f"Compare_report{project_label}_{report_date}_{report_date}.txt"
-        txt_file.write_text(text_report, encoding="utf-8")
-
-        messagebox.showinfo("報告完成", f"純文字報告儲存於：\n{txt_file}")
-
-        # 傳送 LINE 精簡報告
-        summary_text = f"""📊 [{project_label}]素材比對結果（{report_date})\n✅ 對應成功素材數量：{len(matched)}\n\n❌ 專案中使用但資料夾找不到素材（共 {len(missing)} 筆）：\n""" + '\n'.join(f"- {f}" for f in missing)
-        send_to_lambda(summary_text[:4000], uid)
-
-        # 最後儲存設定（若有勾選）
-        save_config()
+    def _worker():
+        """背景執行緒：解析專案 + 掃描資料夾 + 寫報告（不可碰任何 Tk 元件）"""
+        try:
+            matched, missing, extra = compare_filenames(prproj_path, folder_path)
+
+            # 報告內容組合：先收集成 list，最後一次 join（避免字串反覆相加）
+            parts = [
+                "# Premiere 專案素材比對報告",
+                "",
+                "## 專案檔案",
+                f"- {prproj_path}",
+                "",
+                "## 素材資料夾",
+                f"- {folder_path}",
+                "",
+                "---",
+                "",
+                f"## 對應成功的素材（共 {len(matched)} 筆）",
+            ]
+            parts.extend(f"- {f}" for f in matched)
+            parts += ["", "---", "", f"## 專案中使用但資料夾找不到（共 {len(missing)} 筆）"]
+            parts.extend(f"- {f}" for f in missing)
+            parts += ["", "---", "", f"## 資料夾中多餘素材（未在專案引用）（共 {len(extra)} 筆）"]
+            parts.extend(f"- {f}" for f in extra)
+
+            # 寫入純文字檔案
+            txt_file = Path(output_path) / f"Compare_report{project_label}_{report_date}_{report_date}.txt"
+            txt_file.write_text('\n'.join(parts), encoding="utf-8")
+
+            result_q.put(("ok", (matched, missing, extra, txt_file)))
+        except Exception as e:
+            # log 在背景執行緒寫入，主執行緒只負責顯示路徑
+            # 寫 log 本身也可能失敗（例如 log 資料夾被刪）→ 仍要回報結果，否則 _poll 會永遠等下去
+            try:
+                log_path = write_error_log(project_label, e)
+            except Exception as log_exc:
+                print("⚠️ 寫入日誌失敗：", log_exc)
+                log_path = None
+            result_q.put(("error", (e, log_path)))
+
+    def _poll():
+        """主執行緒：每 50ms 檢查一次背景結果，所有 GUI 更新都在這裡做"""
+        try:
+            status, data = result_q.get_nowait()
+        except queue.Empty:
+            root.after(50, _poll)
+            return
+        start_btn.config(state='normal')
+
+        if status == "ok":
+            matched, missing, extra, txt_file = data
+            output_text.delete(1.0, tk.END)
+            # 每個區塊組成一個字串、只 insert 一次（逐行 insert 在素材多時會很慢）
+            #輸出專案名稱
+            output_text.insert(tk.END, f"[{project_label}]\n✅ 對應成功的素材：{len(matched)}\n"
+                               + ''.join(f"  ✅ {f}\n" for f in matched))
+            output_text.insert(tk.END, f"❌ 專案中使用但資料夾找不到：{len(missing)}\n"
+                               + ''.join(f"  ❌ {f}\n" for f in missing))
+            output_text.insert(tk.END, f"⚠️ 資料夾中多餘素材（未在專案引用）：{len(extra)}\n"
+                               + ''.join(f"  ⚠️ {f}\n" for f in extra))
+            # 跳出對話框前先讓文字框重繪一次
+            output_text.update_idletasks()
+
+            messagebox.showinfo("報告完成", f"純文字報告儲存於：\n{txt_file}")
+
+            # 傳送 LINE 精簡報告
+            summary_text = f"""📊 [{project_label}]素材比對結果（{report_date})\n✅ 對應成功素材數量：{len(matched)}\n\n❌ 專案中使用但資料夾找不到素材（共 {len(missing)} 筆）：\n""" + '\n'.join(f"- {f}" for f in missing)
+            send_to_lambda_async(summary_text[:4000], uid)
+
+            # 最後儲存設定（若有勾選）
+            save_config()
+        else:
+            e, log_path = data
+            output_text.delete(1.0, tk.END)
+            # 1) GUI 提示（log 已於背景執行緒寫入；log_path 為 None 代表日誌寫入失敗）
+            log_hint = f"已寫入日誌：\n{log_path}" if log_path else "（日誌寫入失敗）"
+            messagebox.showerror(
+                "解析失敗",
+                f"專案「{project_label}」解析失敗，{log_hint}"
+            )
+            # 2) 傳 LINE 簡訊（只帶錯誤摘要）
+            error_msg = (
+                f"[{project_label}] ❗ 專案解析失敗！\n"
+                f"🚨 錯誤：{e.__class__.__name__} - {e}\n"
+                + (f"🪵 詳細日誌已寫入：{log_path.name}" if log_path else "🪵 詳細日誌寫入失敗")
+            )
+            send_to_lambda_async(error_msg[:4000], uid)
 
-    except Exception as e:
-        # 1) 將完整 traceback 寫入 log
-        log_path = write_error_log(project_label, e)
-        # 2) GUI 提示
-        messagebox.showerror(
-            "解析失敗",
-            f"專案「{project_label}」解析失敗，已寫入日誌：\n{log_path}"
-        )
-        # 3) 傳 LINE 簡訊（只帶錯誤摘要）
-        error_msg = (
-            f"[{project_label}] ❗ 專案解析失敗！\n"
-            f"🚨 錯誤：{e.__class__.__name__} - {e}\n"
-            f"🪵 詳細日誌已寫入：{log_path.name}"
-        )
-        send_to_lambda(error_msg[:4000], uid)
+    # 比對期間停用按鈕，避免重複觸發
+    start_btn.config(state='disabled')
+    output_text.delete(1.0, tk.END)
+    output_text.insert(tk.END, f"[{project_label}] ⏳ 比對中，請稍候…\n")
+    threading.Thread(target=_worker, daemon=True).start()
+    root.after(50, _poll)
 
 # ----------------------------
 # 啟動時載入偏好
@@ -411,6 +608,7 @@ if config.get("output_dir"):
 
 def on_quit():
     save_config()
+    save_parse_cache()
     root.destroy()
 
 root.protocol("WM_DELETE_WINDOW", on_quit)